@@ -0,0 +1,41 @@
+"""add articolul_num indexes to pdfs and dosars
+
+Revision ID: 93d70f1fea6e
+Revises: 4d960622fd50
+Create Date: 2026-10-14 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '93d70f1fea6e'
+down_revision: Union[str, None] = '4d960622fd50'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY can't run inside a transaction block.
+    # `dosars` is created by `setup_db`, not by migrations, so it may be
+    # missing here.
+    has_dosars = sa.inspect(op.get_bind()).has_table('dosars')
+    with op.get_context().autocommit_block():
+        op.create_index('ix_pdfs_articolul_num', 'pdfs', ['articolul_num'],
+                        unique=False, if_not_exists=True,
+                        postgresql_concurrently=True)
+        if has_dosars:
+            op.create_index('ix_dosars_articolul_num_year', 'dosars',
+                            ['articolul_num', 'year'], unique=False,
+                            if_not_exists=True, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_dosars_articolul_num_year', table_name='dosars',
+                      if_exists=True, postgresql_concurrently=True)
+        op.drop_index('ix_pdfs_articolul_num', table_name='pdfs',
+                      if_exists=True, postgresql_concurrently=True)
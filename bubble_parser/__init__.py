@@ -1,11 +1,17 @@
 """Bubble parser. Api for parser and postgres database."""
 from __future__ import annotations
 
+import functools
+
 from envyaml import EnvYAML
 
 
+@functools.cache
 def get_config(path: str | None = None) -> EnvYAML:
-    """Get dict with config values."""
+    """Get dict with config values.
+
+    Config is read once per process, don't mutate the returned values.
+    """
     if not path:
         path = "config.yml"
         
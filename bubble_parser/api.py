@@ -1,25 +1,121 @@
 """Contain a REST API."""
 
 import asyncio
-import json
+import os
 import time
-from datetime import UTC, datetime, timedelta
-from typing import Optional
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Coroutine, Optional
 
 import aiohttp
+import anyio.to_thread
+import orjson
 import uvicorn
-from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from loguru import logger
 
+from bubble_parser.app_types import Dosar
 from bubble_parser.database import (
+    dispose_engine,
     setup_db,
     write_dosars_by_parts,
-    write_result,
+    write_results,
 )
-from bubble_parser.parser import ParserCetatenie, ParserDosars, aiohttp_session
+from bubble_parser.parser import (
+    ParserCetatenie,
+    ParserDosars,
+    shutdown_pdf_pool,
+)
+
+# Requests waiting for `parse_worker`, with futures for their results.
+_parse_queue: asyncio.Queue[tuple[dict, asyncio.Future]] = asyncio.Queue()
+# Max requests merged into one parser run.
+PARSE_BATCH_SIZE = 10
+# Seconds to wait for more requests before a batch is parsed.
+PARSE_BATCH_TIMEOUT = 0.05
+
+# Each worker has its own engine pool of up to 30 connections, keep
+# `workers * 30` below postgres `max_connections` (100 by default).
+WORKERS = int(os.getenv("WEB_CONCURRENCY", "0")) or min(os.cpu_count() or 1, 3)
+
+# Strong references to fire-and-forget jobs, the event loop keeps only
+# weak ones and would let a running task be garbage collected.
+_background_tasks: set[asyncio.Task] = set()
+
+
+def _on_background_task_done(task: asyncio.Task) -> None:
+    _background_tasks.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.opt(exception=task.exception()).error(
+            f"background task {task.get_name()} failed"
+        )
+
+
+def setup_logging() -> None:
+    """Add file sink for logs of the current process."""
+    logger.add(
+        f"log_{{time}}_{os.getpid()}.log",
+        level="INFO",
+        rotation="1 day",
+        enqueue=True,
+    )
+
+
+def run_in_background(coro: Coroutine[Any, Any, Any]) -> asyncio.Task:
+    """Schedule coroutine on the running loop without awaiting it."""
+    task = asyncio.create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_on_background_task_done)
+    return task
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create shared resources on startup and release them on shutdown."""
+    # Starlette runs sync dependencies and background tasks through
+    # anyio, which allows only 40 threads by default.
+    anyio.to_thread.current_default_thread_limiter().total_tokens = 200
+    if os.getenv("BUBBLE_PARSER_LOG_FILE"):
+        setup_logging()
+    app.state.http = aiohttp.ClientSession(
+        timeout=aiohttp.ClientTimeout(total=10),
+        connector=aiohttp.TCPConnector(limit=100, ttl_dns_cache=300),
+    )
+    worker = asyncio.create_task(parse_worker())
+    try:
+        yield
+    finally:
+        worker.cancel()
+        await app.state.http.close()
+        await dispose_engine()
+        await asyncio.to_thread(shutdown_pdf_pool)
+
+
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
 
-app = FastAPI()
+
+async def post_json(url: str, data: Any) -> None:
+    """Send `data` serialized with orjson to `url`."""
+    async with app.state.http.post(
+        url,
+        data=orjson.dumps(data),
+        headers={"Content-Type": "application/json"},
+    ):
+        pass
+
+
+async def iter_dosars_json(
+    head: dict, dosars: list[Dosar], chunk_size: int = 500
+) -> AsyncIterator[bytes]:
+    """Yield JSON object `head` with `dosars` array, chunk by chunk."""
+    yield orjson.dumps(head)[:-1] + b',"dosars":['
+    for i in range(0, len(dosars), chunk_size):
+        chunk = b",".join(
+            dosar.model_dump_json().encode()
+            for dosar in dosars[i : i + chunk_size]
+        )
+        yield chunk if i == 0 else b"," + chunk
+    yield b"]}"
 
 
 @app.post("/is_work")
@@ -32,7 +128,7 @@ async def is_work() -> dict:
 @app.post("/get_updates")
 async def get_updates(data: str) -> dict:
     """Get updates."""
-    request = json.loads(data)
+    request = orjson.loads(data)
     logger.info(f"/get_updates trigerred with data - {data}")
     return await get_result(request=request)
 
@@ -45,15 +141,7 @@ async def get_dosars(data: Optional[int] = None, url: Optional[str] = None):
     else:
         articoluls = int(data)
 
-    scheduler = AsyncIOScheduler()
-    date = datetime.now().astimezone(UTC) + timedelta(seconds=1)
-    scheduler.add_job(
-        process_dosars,
-        args=(articoluls, url),
-        run_date=date,
-        timezone="utc",
-    )
-    scheduler.start()
+    run_in_background(process_dosars(articoluls, url))
 
     return {
         "ok": True,
@@ -64,18 +152,10 @@ async def get_dosars(data: Optional[int] = None, url: Optional[str] = None):
 @app.post("/update")
 async def subscribe_for_update(url: str, data: str) -> dict:
     """Subscribe for updates."""
-    data = json.loads(data)
-    scheduler = AsyncIOScheduler()
-    date = datetime.now().astimezone(UTC) + timedelta(seconds=1)
-    scheduler.add_job(
-        webhook_response,
-        args=(url, data, scheduler),
-        run_date=date,
-        timezone="utc",
-    )
-    scheduler.start()
+    data = orjson.loads(data)
+    run_in_background(webhook_response(url, data))
 
-    logger.info(f"/update trigerred with data - {data}. scheduler started")
+    logger.info(f"/update trigerred with data - {data}. task started")
 
     return {
         "ok": True,
@@ -87,103 +167,200 @@ async def subscribe_for_update(url: str, data: str) -> dict:
 
 
 async def process_dosars(articolul_num: int | None, url: str = None):
-    p = ParserDosars()
-    dosars = await p.parse_dosars(articolul_num=articolul_num)
+    async with ParserDosars() as p:
+        dosars = await p.parse_dosars(articolul_num=articolul_num)
 
     try:
         await write_dosars_by_parts(dosars)
-        msg = {
+        head = {
             "ok": True,
             "message": f"{len(dosars)} dosars written to db",
-            "dosars": [d.model_dump_json(indent=2) for d in dosars],
         }
     except Exception as e:
         logger.exception(e)
-        msg = {
+        head = {
             "ok": False,
             "message": f"write dosars to db was failed with error {str(e)}",
-            "dosars": [d.model_dump_json() for d in dosars],
         }
 
-    @aiohttp_session(timeout=10)
-    async def send_request(_, session: aiohttp.ClientSession):
-        await session.post(url, json=msg)
-
     if url:
         try:
-            await send_request("")
+            async with app.state.http.post(
+                url,
+                data=iter_dosars_json(head, dosars),
+                headers={"Content-Type": "application/json"},
+            ):
+                pass
         except Exception as e:
             logger.exception(e)
 
 
 async def get_result(request: dict) -> dict:
-    """Get results."""
-    parser = ParserCetatenie()
-    src_path = f"{time.time()}_{len(str(request))}"
+    """Get results.
+
+    Request is parsed together with other requests received at the same
+    moment, see `parse_worker`.
+    """
+    future = asyncio.get_running_loop().create_future()
+    await _parse_queue.put((request, future))
+    return await future
+
+
+async def parse_worker() -> None:
+    """Collect queued requests in batches and run a parser per batch."""
+    while True:
+        batch = [await _parse_queue.get()]
+        while len(batch) < PARSE_BATCH_SIZE:
+            try:
+                item = await asyncio.wait_for(
+                    _parse_queue.get(), PARSE_BATCH_TIMEOUT
+                )
+            except TimeoutError:
+                break
+            batch.append(item)
+
+        run_in_background(process_batch(batch))
+
+
+async def process_batch(batch: list[tuple[dict, asyncio.Future]]) -> None:
+    """Parse all requests of batch with one parser run.
+
+    Malformed requests are rejected before the run, so they don't fail
+    the others. Future of every request is resolved, with an exception
+    if its result couldn't be made.
+    """
+    valid = []
+    for request, future in batch:
+        try:
+            ParserCetatenie.validate_articoluls_data(request)
+        except TypeError as exc:
+            if not future.done():
+                future.set_result(error_result(exc))
+        else:
+            valid.append((request, future))
+    if not valid:
+        return
+
+    requests = [request for request, _ in valid]
+    merged = merge_requests(requests)
+    error = None
     try:
-        res = await parser.parse_articoluls(request, src_path)
+        res = await parse_updates(merged)
     except Exception as exc:
         logger.exception(exc)
-        data = {
-            "ok": False,
-            "message": f"{exc.__class__.__name__}: {exc!s}",
-            "result": {},
-        }
-    else:
-        data = {
+        error = exc
+
+    try:
+        for request, future in valid:
+            if future.done():
+                continue
+            if error is None:
+                future.set_result(make_result(res, request))
+            else:
+                future.set_result(error_result(error))
+    except Exception as exc:
+        logger.exception(exc)
+        for _, future in valid:
+            if not future.done():
+                future.set_exception(exc)
+
+
+def error_result(exc: Exception) -> dict:
+    """Make response for request which failed with `exc`."""
+    return {
+        "ok": False,
+        "message": f"{exc.__class__.__name__}: {exc!s}",
+        "result": {},
+    }
+
+
+def merge_requests(requests: list[dict]) -> dict:
+    """Merge request bodies into one body for `parse_articoluls`.
+
+    Year is parsed if any request asks for it, list is skipped only if
+    every request asking for this year already has it. Requests must be
+    checked by `ParserCetatenie.validate_articoluls_data` first.
+    """
+    merged: dict[str, dict[str, set]] = {}
+    for request in requests:
+        for articolul, years in request.items():
+            merged_years = merged.setdefault(articolul, {})
+            for year, known in years.items():
+                if year in merged_years:
+                    merged_years[year] &= set(known)
+                else:
+                    merged_years[year] = set(known)
+
+    return {
+        articolul: {year: list(known) for year, known in years.items()}
+        for articolul, years in merged.items()
+    }
+
+
+def make_result(res: Any, request: dict) -> dict:
+    """Make response for request from result of merged parser run."""
+    if not isinstance(res, dict):
+        return {
             "ok": False,
             "message": f"Wrong result: {res}",
             "result": {},
         }
 
-        if isinstance(res, dict):
-            data = {
-                "ok": True,
-                "message": "the proccess finish successfully",
-                "result": res,
-            }
+    result = {}
+    for articolul, pdfs in res.items():
+        years = request.get(articolul)
+        if years is None:
+            continue
 
-            try:
-                for articolul in res:
-                    articolul_num = int(articolul[-2:])
-                    await write_result(articolul_num, res[articolul])
-            except Exception as exc:
-                logger.exception(exc)
+        result[articolul] = [
+            pdf
+            for pdf in pdfs
+            if str(pdf["year"]) in years
+            and pdf["list_name"] not in years[str(pdf["year"])]
+        ]
+
+    return {
+        "ok": True,
+        "message": "the proccess finish successfully",
+        "result": result,
+    }
 
-    return data
 
+async def parse_updates(request: dict) -> Any:
+    """Parse new articoluls pdfs and write them to database."""
+    src_path = f"{time.monotonic_ns()}_{id(request)}"
+    async with ParserCetatenie() as parser:
+        res = await parser.parse_articoluls(request, src_path)
+
+    if isinstance(res, dict):
+        try:
+            await write_results(res)
+        except Exception as exc:
+            logger.exception(exc)
+
+    return res
 
-async def webhook_response(
-    url: str, request: dict, scheduler: AsyncIOScheduler
-) -> None:
-    """Send webhook response."""
-    data = await get_result(request=request)
 
+async def webhook_response(url: str, request: dict) -> None:
+    """Send webhook response."""
     try:
-        async with aiohttp.ClientSession() as session:  # noqa: SIM117
-            async with session.post(url, json=data):
-                pass
+        data = await get_result(request=request)
+        await post_json(url, data)
     except Exception as exc:
-        data = {
-            "ok": False,
-            "message": f"{exc.__class__.__name__}: {exc!s}",
-            "result": {},
-        }
         logger.exception(exc)
-        async with aiohttp.ClientSession() as session:  # noqa: SIM117
-            async with session.post(url, json=data):
-                pass
-    finally:
-        scheduler.remove_all_jobs()
-        scheduler.shutdown(wait=False)
-        del scheduler
+        await post_json(url, error_result(exc))
 
 
 if __name__ == "__main__":
-    logger.add(
-        "log_{time}.log",
-        level="INFO",
-        rotation="1 day",
-    )
+    # Workers are separate processes, each adds its own log file sink
+    # in `lifespan`.
+    os.environ["BUBBLE_PARSER_LOG_FILE"] = "1"
     asyncio.run(setup_db())
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    uvicorn.run(
+        "bubble_parser.api:app",
+        host="0.0.0.0",
+        port=8000,
+        workers=WORKERS,
+        loop="uvloop",
+        http="httptools",
+    )
@@ -43,8 +43,4 @@ class Dosar(BaseModel):
 
 def dump_without_null(model_type: BaseModel) -> dict:
     """Dump type values without null."""
-    obj = dict(model_type)
-    for field_name in model_type.model_fields:
-        if getattr(model_type, field_name) == NULL:
-            del obj[field_name]
-    return obj
+    return model_type.model_dump(exclude_none=True)
@@ -1,13 +1,17 @@
 from __future__ import annotations
 
 import asyncio
+import math
 import os
 from datetime import datetime
 import pickle
 
+from typing import Any
+
+from sqlalchemy import Connection, inspect, text
 from sqlalchemy.ext.asyncio import (
     AsyncEngine,
-    async_scoped_session,
+    AsyncSession,
     async_sessionmaker,
     create_async_engine,
 )
@@ -21,16 +25,62 @@ from bubble_parser.repositories import (
     DosarRepository,
 )
 
+# Dosars in one INSERT. Dosar has 8 columns, so this keeps a batch far
+# below the postgres limit of 65535 bind parameters per statement.
+DOSARS_BATCH_SIZE = 1000
+# Max pdf inserts in flight, keeps them within the engine pool.
+PDFS_WRITE_CONCURRENCY = 20
+# Pdfs in one INSERT, one statement per chunk instead of per row.
+PDFS_BATCH_SIZE = 500
+
 
 async def setup_db() -> None:
-    """Create all tables in database."""
-    async with create_sqlalchemy_async_engine().begin() as conn:
+    """Create all tables in database.
+
+    `create_all` doesn't alter existing tables, so constraints which
+    upserts rely on are added here too.
+    """
+    # Usually runs in its own event loop before the server starts, so it
+    # must not leave connections in the pool of the shared engine.
+    engine = create_sqlalchemy_async_engine()
+    async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(ensure_articoluls_number_key)
+    await engine.dispose()
+
+
+def ensure_articoluls_number_key(conn: Connection) -> None:
+    """Add unique constraint on `articoluls.number` if it's missing.
+
+    `ArticolulRepository` inserts with `ON CONFLICT (number)`, which
+    fails without it. Databases restored from the shipped dump predate
+    migration `f5e7d0eae256`, which adds the same constraint.
+    """
+    uniques = inspect(conn).get_unique_constraints("articoluls")
+    if any(unique["column_names"] == ["number"] for unique in uniques):
+        return
+
+    # Keep the oldest of duplicated articoluls, as the migration does.
+    conn.execute(
+        text(
+            "DELETE FROM articoluls a USING articoluls b "
+            "WHERE a.number = b.number AND a.articolul_id > b.articolul_id"
+        )
+    )
+    conn.execute(
+        text(
+            "ALTER TABLE articoluls "
+            "ADD CONSTRAINT articoluls_number_key UNIQUE (number)"
+        )
+    )
+
 
+def create_sqlalchemy_async_engine(**kwargs: Any) -> AsyncEngine:
+    """Return sqlalchemy async engine from config.
 
-def create_sqlalchemy_async_engine() -> AsyncEngine:
-    """Return sqlalchemy async engine from config."""
-    cfg = get_config()["postgres"]
+    Keyword arguments are passed to `create_async_engine`.
+    """
+    cfg = dict(get_config()["postgres"])
     host = os.getenv("POSTGRES_HOST")
 
     if host:
@@ -40,45 +90,138 @@ def create_sqlalchemy_async_engine() -> AsyncEngine:
         f"postgresql+asyncpg://{cfg["user"]}:{cfg["password"]}@"
         f"{cfg["host"]}:{cfg["port"]}/{cfg["dbname"]}"
     )
-    return create_async_engine(url).execution_options(
+    return create_async_engine(url, **kwargs).execution_options(
         isolation_level="AUTOCOMMIT"
     )
 
 
+# Engine and sessionmaker of each event loop. asyncpg connections are
+# bound to the loop they were opened in, so loops can't share a pool.
+_engines: dict[
+    asyncio.AbstractEventLoop,
+    tuple[AsyncEngine, async_sessionmaker[AsyncSession]],
+] = {}
+
+
+def _loop_engine() -> tuple[AsyncEngine, async_sessionmaker[AsyncSession]]:
+    loop = asyncio.get_running_loop()
+    if loop not in _engines:
+        # Pools of closed loops can't be disposed anymore, just drop them.
+        for closed in [other for other in _engines if other.is_closed()]:
+            del _engines[closed]
+
+        engine = create_sqlalchemy_async_engine(
+            pool_size=20, max_overflow=10, pool_pre_ping=True
+        )
+        _engines[loop] = (
+            engine,
+            async_sessionmaker(engine, expire_on_commit=False),
+        )
+    return _engines[loop]
+
+
+def get_engine() -> AsyncEngine:
+    """Return sqlalchemy async engine shared by the running event loop."""
+    return _loop_engine()[0]
+
+
+def get_sessionmaker() -> async_sessionmaker[AsyncSession]:
+    """Return sessionmaker bound to the engine of the running event loop."""
+    return _loop_engine()[1]
+
+
+async def dispose_engine() -> None:
+    """Close all pooled connections of the running event loop's engine."""
+    engines = _engines.pop(asyncio.get_running_loop(), None)
+    if engines is not None:
+        await engines[0].dispose()
+
+
+def parse_date(value: str) -> datetime:
+    """Parse date formatted as `DD.MM.YYYY`.
+
+    Slices the fixed-width string instead of going through `strptime`.
+    """
+    return datetime(int(value[6:10]), int(value[3:5]), int(value[0:2]))
+
+
+async def write_results(results: dict[str, list[dict]]) -> None:
+    """Write results of `parse_articoluls` for all articoluls to database.
+
+    Parent articoluls are created with one statement, then pdfs of all
+    articoluls are written concurrently.
+    """
+    pdfs_by_num = {
+        int(articolul[-2:]): pdfs for articolul, pdfs in results.items()
+    }
+    session = get_sessionmaker()
+    async with session() as db:
+        repository = ArticolulRepository(db)
+        await repository.bulk_create(
+            [Articolul(number=num) for num in pdfs_by_num]
+        )
+
+    sem = asyncio.Semaphore(PDFS_WRITE_CONCURRENCY)
+    await asyncio.gather(
+        *(write_pdfs(num, pdfs, sem) for num, pdfs in pdfs_by_num.items())
+    )
+
+
 async def write_result(articolul_num: int, pdfs: list[dict]) -> None:
     """Write result to database."""
     articolul_num = int(articolul_num)
-    session = async_sessionmaker(
-        create_sqlalchemy_async_engine(), expire_on_commit=False
-    )
-    scoped_sessionmaker = async_scoped_session(session, asyncio.current_task)
-    async with scoped_sessionmaker() as db:
+    session = get_sessionmaker()
+    async with session() as db:
         repository = ArticolulRepository(db)
-        articolul = await repository.get_by_num(articolul_num=articolul_num)
-        if not articolul:
-            articolul = Articolul(number=articolul_num)
-            await repository.create(articolul=articolul)
+        await repository.create(articolul=Articolul(number=articolul_num))
 
-    async def write(pdf: ArticolulPDF):
-        async with scoped_sessionmaker() as db:
+    await write_pdfs(articolul_num, pdfs)
+
+
+async def write_pdfs(
+    articolul_num: int,
+    pdfs: list[dict],
+    sem: asyncio.Semaphore | None = None,
+) -> None:
+    """Write pdfs of articolul to database.
+
+    Parameters
+    ----------
+    articolul_num : int
+        articolul num of pdfs.
+    pdfs : list[dict]
+        pdfs from `parse_articoluls` result.
+    sem : asyncio.Semaphore | None, optional
+        bounds concurrent inserts of `PDFS_BATCH_SIZE` chunks, by default
+        a new one allowing `PDFS_WRITE_CONCURRENCY` inserts.
+    """
+    session = get_sessionmaker()
+    if sem is None:
+        sem = asyncio.Semaphore(PDFS_WRITE_CONCURRENCY)
+
+    async def write(part: list[ArticolulPDF]):
+        async with sem, session() as db:
             repository = ArticolulPDFRepository(db)
-            await repository.create(pdf)
+            await repository.bulk_create(part)
 
-    tasks = []
+    articolul_pdfs = []
     for pdf in pdfs:
-        pdf_date = datetime.strptime(pdf["date"], "%d.%m.%Y")
-        articolur_pdf = ArticolulPDF(
-            articolul_num=articolul_num,
-            list_name=pdf["list_name"],
-            number_order=pdf["number_order"],
-            date=pdf_date,
-            year=pdf_date.year,
-            url=pdf["pdf_link"],
-            parsed_at=int(pdf["timestamp"]),
+        pdf_date = parse_date(pdf["date"])
+        articolul_pdfs.append(
+            ArticolulPDF(
+                articolul_num=articolul_num,
+                list_name=pdf["list_name"],
+                number_order=pdf["number_order"],
+                date=pdf_date,
+                year=pdf_date.year,
+                url=pdf["pdf_link"],
+                parsed_at=int(pdf["timestamp"]),
+            )
         )
-        tasks.append(write(articolur_pdf))
 
-    await asyncio.gather(*tasks)
+    async with asyncio.TaskGroup() as tg:
+        for i in range(0, len(articolul_pdfs), PDFS_BATCH_SIZE):
+            tg.create_task(write(articolul_pdfs[i : i + PDFS_BATCH_SIZE]))
 
 
 async def write_dosars(dosars: list[Dosar]):
@@ -89,21 +232,10 @@ async def write_dosars(dosars: list[Dosar]):
     dosars : list[Dosar]
         dosars list.
     """
-    session = async_sessionmaker(
-        create_sqlalchemy_async_engine(), expire_on_commit=False
-    )
-    scoped_sessionmaker = async_scoped_session(session, asyncio.current_task)
-    tasks = []
-
-    async def write(dosar: Dosar):
-        async with scoped_sessionmaker() as db:
-            repository = DosarRepository(db)
-            await repository.create(dosar)
-
-    for dosar in dosars:
-        tasks.append(write(dosar))
-
-    await asyncio.gather(*tasks)
+    session = get_sessionmaker()
+    async with session() as db:
+        repository = DosarRepository(db)
+        await repository.bulk_create(dosars)
 
 
 def divide_list(lst, n):
@@ -132,15 +264,30 @@ def divide_list(lst, n):
     return chunks
 
 
-async def write_dosars_by_parts(dosars: list[Dosar]):
+async def write_dosars_by_parts(
+    dosars: list[Dosar],
+    batch_size: int = DOSARS_BATCH_SIZE,
+    group_by: int = 4,
+):
     """Divide list dosars by equals parts and write them into database
 
     Parameters
     ----------
     dosars : list[Dosar]
         list of dosars
+    batch_size : int, optional
+        max dosars in one INSERT, by default `DOSARS_BATCH_SIZE`.
+    group_by : int, optional
+        max parts written concurrently, by default 4.
     """
-    parts = divide_list(dosars, 1000)
+    if not dosars:
+        return
+
+    parts = divide_list(dosars, math.ceil(len(dosars) / batch_size))
+    sem = asyncio.Semaphore(group_by)
+
+    async def write(part: list[Dosar]) -> None:
+        async with sem:
+            await write_dosars(part)
 
-    tasks = [write_dosars(ds) for ds in parts]
-    await asyncio.gather(*tasks)
+    await asyncio.gather(*(write(part) for part in parts))
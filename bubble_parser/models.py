@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import VARCHAR, DateTime, Integer
+from sqlalchemy import VARCHAR, DateTime, Index, Integer
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 
 
@@ -13,7 +13,7 @@ class Articolul(Base):
 
     __tablename__ = "articoluls"
     articolul_id: Mapped[int] = mapped_column(Integer, primary_key=True)
-    number: Mapped[int] = mapped_column(Integer)
+    number: Mapped[int] = mapped_column(Integer, unique=True)
     url: Mapped[str] = mapped_column(VARCHAR(150), nullable=True)
 
 
@@ -21,6 +21,7 @@ class ArticolulPDF(Base):
     """PDF articolul."""
 
     __tablename__ = "pdfs"
+    __table_args__ = (Index("ix_pdfs_articolul_num", "articolul_num"),)
     pdf_id: Mapped[int] = mapped_column(
         Integer, primary_key=False, autoincrement=True, nullable=True
     )
@@ -49,6 +50,9 @@ class Dosar(Base):
     """
     
     __tablename__ = "dosars"
+    __table_args__ = (
+        Index("ix_dosars_articolul_num_year", "articolul_num", "year"),
+    )
     record_id: Mapped[int] = mapped_column(Integer, autoincrement=True, nullable=True)
     num_dosar: Mapped[int] = mapped_column(Integer, nullable=True)
     date: Mapped[datetime] = mapped_column(
@@ -3,47 +3,235 @@
 from __future__ import annotations
 
 import asyncio
-from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import contextlib
 import datetime
+import functools
+from itertools import repeat
+import multiprocessing
+import os
+from pathlib import Path
 import pickle
 import random
 import re
 import shutil
+import tempfile
+import threading
 import time
-from functools import wraps
-from pathlib import Path
-from typing import Any, Callable, Coroutine, List
+from types import MappingProxyType
+from typing import Any, Callable, Coroutine, List, Mapping
 
-import aiofiles
-from aiohttp import ClientSession, ClientTimeout, TCPConnector
 import aiohttp
-import ua_generator
-from bs4 import BeautifulSoup, Tag
+from aiohttp import ClientSession, TCPConnector
+from dateutil.parser import parse
 from fake_useragent import UserAgent
-from pdfminer.high_level import extract_text
-import tempfile
 import fitz
-from dateutil.parser import parse
+from loguru import logger
+from lxml import etree, html as lxml_html
+from pdfminer.high_level import extract_text
+import ua_generator
 
 from bubble_parser.app_types import Dosar
 
+# Numbered line of orders list, like `1. (9977/2022)`.
+_NUMBER_ORDER_RE = re.compile(r"^\d+\. (.+)", re.MULTILINE)
+# Key of articolul in request body, like `articolul_10`.
+_ARTICOLUL_KEY_RE = re.compile(r"articolul_(\d+)")
+# Publication date of order in articles list, like `12.05.2023`.
+_DATE_RE = re.compile(r"(\d+)\.(\d+)\.(\d+)")
+
+# Items with links of articles lists on articolul page.
+_ARTICLES_XPATH = etree.XPath(
+    "/descendant::div[contains(concat(' ', normalize-space(@class), ' '),"
+    " ' penci-entry-content ')][1]//ul//li[descendant::a[@href]]"
+)
+# Items of dosars list in panel `$panel` of stadiu-dosar page.
+_RECORDS_XPATH = etree.XPath(
+    "/descendant::div[contains(concat(' ', normalize-space(@class), ' '),"
+    " ' vc_tta-panels ')][1]/descendant::div[@id=$panel][1]"
+    "/descendant::ul[1]//li"
+)
+# First link of list item.
+_LINK_XPATH = etree.XPath("descendant::a[@href][1]")
+
+# Worker processes of `get_pdf_pool`.
+PDF_POOL_WORKERS = min(os.cpu_count() or 1, 8)
+
+_pdf_pool: ProcessPoolExecutor | None = None
+_pdf_pool_lock = threading.Lock()
+
+
+def get_pdf_pool() -> ProcessPoolExecutor:
+    """Return process pool for CPU-bound pdf parsing, create it lazily."""
+    global _pdf_pool
+    with _pdf_pool_lock:
+        if _pdf_pool is None:
+            _pdf_pool = ProcessPoolExecutor(
+                max_workers=PDF_POOL_WORKERS,
+                # Forking a process with a running event loop and threads
+                # is unsafe.
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pdf_pool
+
+
+def shutdown_pdf_pool() -> None:
+    """Stop worker processes of pdf pool."""
+    global _pdf_pool
+    with _pdf_pool_lock:
+        if _pdf_pool is not None:
+            _pdf_pool.shutdown(cancel_futures=True)
+            _pdf_pool = None
+
+
+@functools.lru_cache(maxsize=256)
+def _is_bold(font: str) -> bool:
+    """Return whether pdf font name is a bold font."""
+    return "bold" in font.lower()
+
+
+def _extract_pages_content(
+    path_to_pdf: str, start: int, stop: int
+) -> tuple[list[str], list[str]]:
+    """Extract text of pdf pages `[start, stop)`.
+
+    Returns bold spans of page `start` and non-bold text blocks of all
+    pages, spans of a block are joined by `$`. Runs in `get_pdf_pool`
+    workers, so it reopens the document: MuPDF documents can't be sent
+    between processes. Opening for every page would parse the xref once
+    per page, so each call handles a whole range.
+    """
+    heads = []
+    contents = []
+    with fitz.open(path_to_pdf) as pages:
+        for page_num in range(start, stop):
+            obj = pages[page_num].get_textpage().extractDICT()
+            line_content = []
+            for block in obj["blocks"]:
+                for line in block["lines"]:
+                    if any(_is_bold(s["font"]) for s in line["spans"]):
+                        if page_num == start:
+                            heads.extend(
+                                span["text"]
+                                for span in line["spans"]
+                                if _is_bold(span["font"])
+                            )
+                        continue
+
+                    for span in line["spans"]:
+                        v = span["text"].strip()
+                        line_content.append(v)
+
+                line_raw = "$".join(line_content)
+                if not line_raw:
+                    continue
+                contents.append(line_raw)
+                line_content = []
+
+    return heads, contents
+
+
+# Size of user agent pools, sampled once per process.
+USER_AGENTS_POOL_SIZE = 50
+
+
+@functools.cache
+def _user_agents() -> tuple[str, ...]:
+    """Return pool of random desktop user agents."""
+    ua = UserAgent()
+    return tuple(ua.random for _ in range(USER_AGENTS_POOL_SIZE))
+
+
+@functools.cache
+def _mobile_ua_headers() -> tuple[dict[str, str], ...]:
+    """Return pool of mobile user agent headers from `ua_generator`."""
+    return tuple(
+        ua_generator.generate(platform=("android", "ios")).headers.get()
+        for _ in range(USER_AGENTS_POOL_SIZE)
+    )
+
+
+# Size of body chunks kept in memory by `_save_response`.
+WRITE_BUFFER_SIZE = 1024 * 1024
+
+
+def _write_all(fd: int, data: bytes) -> None:
+    """Write `data` to file descriptor, retrying partial writes."""
+    view = memoryview(data)
+    while view:
+        view = view[os.write(fd, view) :]
+
+
+async def _save_response(resp: aiohttp.ClientResponse, path: str) -> None:
+    """Stream response body to `path`, overwriting the file.
+
+    Chunks are buffered up to `WRITE_BUFFER_SIZE` and every buffer is
+    written in one thread hop, so pdfs are never held in memory whole.
+    """
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    write = None
+
+    async def flush(buffer: bytearray) -> None:
+        nonlocal write
+        write = asyncio.ensure_future(
+            asyncio.to_thread(_write_all, fd, bytes(buffer))
+        )
+        # Cancelling the await doesn't stop the thread.
+        await asyncio.shield(write)
+
+    try:
+        buffer = bytearray()
+        async for chunk in resp.content.iter_chunked(64 * 1024):
+            buffer += chunk
+            if len(buffer) >= WRITE_BUFFER_SIZE:
+                await flush(buffer)
+                buffer.clear()
+        if buffer:
+            await flush(buffer)
+    finally:
+        if write is not None and not write.done():
+            # Cancelled, e.g. by timeout of `aiohttp_session`, while the
+            # thread still writes to fd. It's closed once the write ends,
+            # and the file is unlinked so a retry doesn't share it.
+            os.unlink(path)
+            write.add_done_callback(functools.partial(_close_after_write, fd))
+        else:
+            os.close(fd)
+
+
+def _close_after_write(fd: int, write: asyncio.Future) -> None:
+    if not write.cancelled():
+        # Nobody awaits the write anymore, its error isn't needed.
+        write.exception()
+    os.close(fd)
+
 
 def aiohttp_session(
     timeout: int = 5,
     attempts: int = 5,
     sleeps: tuple[float, float] = (0.5, 1.5),
+    semaphore: asyncio.Semaphore | None = None,
 ) -> Any:
     """Decorate web scrapping function.
-    This decorator generate aiohttp.ClientSession.
+    This decorator pass aiohttp.ClientSession of parser to function.
+
+    If parser isn't opened with `async with`, the session is created for
+    this call only.
 
     Parameters
     ----------
     timeout : int, optional
-        timeout, by default 5.
+        timeout for one attempt, by default 5.
     attempts : int, optional
-        attempts for parse, by default 5.
+        retries after timeouts and connection errors, by default 5.
     sleeps : tuple[float, float], optional
-        range for `asyncio.sleep(random.uniform())`, by default (0.5, 1.5).
+        first and longest delay between attempts, by default (0.5, 1.5).
+        Delay doubles after every attempt, plus random jitter up to
+        the first delay.
+    semaphore : asyncio.Semaphore | None, optional
+        held during every attempt, not while sleeping between them,
+        by default None.
 
     Returns
     -------
@@ -52,40 +240,39 @@ def aiohttp_session(
     """
 
     def wrapper(f: Callable):
-        @wraps(f)
-        async def inner(self: ParserCetatenie, *args, **kwargs):
-            nonlocal attempts
-
-            headers = HEADERS
-            headers["User-Agent"] = UserAgent().random
-            client_timeout = ClientTimeout(total=timeout)
-            connector = TCPConnector(ssl=False, limit_per_host=10)
-            async with ClientSession(
-                connector=connector,
-                timeout=client_timeout,
-                headers=headers,
-                trust_env=True,
-            ) as session:
-                try:
-                    result = await f(self, session, *args, **kwargs)
-                except asyncio.TimeoutError:
-                    if attempts > 0:
-                        attempts = attempts - 1
-                        await asyncio.sleep(random.uniform(*sleeps))
-                        return await inner(self, *args, **kwargs)
-                    raise
-                else:
-                    return result
-                finally:
-                    if not session.closed:
-                        await session.close()
+        @functools.wraps(f)
+        async def inner(self: SessionParser, *args, **kwargs):
+            session = self._session
+            own_session = session is None
+            if own_session:
+                session = client_session(headers=self.session_headers())
+
+            try:
+                for attempt in range(attempts + 1):
+                    try:
+                        async with (
+                            semaphore or contextlib.nullcontext(),
+                            asyncio.timeout(timeout),
+                        ):
+                            return await f(self, session, *args, **kwargs)
+                    except (
+                        asyncio.TimeoutError,
+                        aiohttp.ClientConnectionError,
+                    ):
+                        if attempt == attempts:
+                            raise
+                    delay = min(sleeps[1], sleeps[0] * 2**attempt)
+                    await asyncio.sleep(delay + random.uniform(0, sleeps[0]))
+            finally:
+                if own_session:
+                    await session.close()
 
         return inner
 
     return wrapper
 
 
-HEADERS = {
+HEADERS = MappingProxyType({
     "Accept": (
         "text/html,application/xhtml+xml,application/xml;q=0.9,"
         "image/avif,image/webp,image/apng,*/*;q=0.8,application/"
@@ -109,10 +296,10 @@ HEADERS = {
     ),
     "sec-ch-ua-mobile": "?0",
     "sec-ch-ua-platform": '"Linux"',
-}
+})
 
 
-PDF_HEADERS = {
+PDF_HEADERS = MappingProxyType({
     "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7",
     "Accept-Language": "ru-RU,ru;q=0.9,en-US;q=0.8,en;q=0.7,my;q=0.6",
     "Cache-Control": "no-cache",
@@ -128,10 +315,132 @@ PDF_HEADERS = {
     "sec-ch-ua": '"Google Chrome";v="125", "Chromium";v="125", "Not.A/Brand";v="24"',
     "sec-ch-ua-mobile": "?0",
     "sec-ch-ua-platform": '"Linux"',
-}
+})
+
+
+# Max urls in `_HTTP_CACHE`, bounds its memory in every worker.
+HTTP_CACHE_SIZE = 4096
+
+
+class _HTTPCache:
+    """Validators and parsed content of responses by url.
+
+    Least recently used urls are evicted above `maxsize`.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self._entries: OrderedDict[str, tuple[dict[str, str], Any]] = (
+            OrderedDict()
+        )
+
+    def get(self, url: str) -> tuple[dict[str, str], Any] | None:
+        """Return validators and content of `url`, if it's cached."""
+        entry = self._entries.get(url)
+        if entry is not None:
+            self._entries.move_to_end(url)
+        return entry
+
+    def set(self, url: str, validators: dict[str, str], content: Any) -> None:
+        """Cache validators and content of `url`."""
+        self._entries[url] = (validators, content)
+        self._entries.move_to_end(url)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+
+# Pages and pdfs fetched by this process. Unchanged ones are answered
+# with 304 and not parsed again.
+_HTTP_CACHE = _HTTPCache(HTTP_CACHE_SIZE)
+
+
+def _conditional_headers(
+    cached: tuple[dict[str, str], Any] | None,
+) -> dict[str, str]:
+    """Return `If-None-Match`/`If-Modified-Since` for `cached` entry."""
+    if cached is None:
+        return {}
+    validators, _ = cached
+    headers = {}
+    if "ETag" in validators:
+        headers["If-None-Match"] = validators["ETag"]
+    if "Last-Modified" in validators:
+        headers["If-Modified-Since"] = validators["Last-Modified"]
+    return headers
+
+
+def _validators(resp: aiohttp.ClientResponse) -> dict[str, str]:
+    """Return `ETag` and `Last-Modified` headers of response."""
+    return {
+        k: resp.headers[k]
+        for k in ("ETag", "Last-Modified")
+        if k in resp.headers
+    }
+
+
+def client_session(
+    limit_per_host: int = 10, headers: Mapping[str, str] | None = None
+) -> ClientSession:
+    """Create aiohttp session for requests to `cetatenie.just.ro`.
+
+    Session sends `headers`, by default `HEADERS` with a random desktop
+    user agent.
+    """
+    if headers is None:
+        headers = HEADERS | {"User-Agent": random.choice(_user_agents())}
+    connector = TCPConnector(
+        ssl=False,
+        limit=64,
+        limit_per_host=limit_per_host,
+        ttl_dns_cache=300,
+        keepalive_timeout=60,
+    )
+    return ClientSession(
+        connector=connector,
+        headers=headers,
+        trust_env=True,
+    )
+
+
+class SessionParser:
+    """Base of parsers which share one aiohttp session between requests.
+
+    Use parser as async context manager to reuse connections, e.g.
+    `async with ParserDosars() as parser: ...`.
+
+    Parameters
+    ----------
+    max_concurrent_pdfs : int, optional
+        limit of simultaneous pdf downloads, by default 12.
+    """
+
+    _session: ClientSession | None = None
+
+    def __init__(self, max_concurrent_pdfs: int = 12) -> None:
+        self.max_concurrent_pdfs = max_concurrent_pdfs
+        self._pdf_sem = asyncio.Semaphore(max_concurrent_pdfs)
+
+    def session_headers(self) -> Mapping[str, str] | None:
+        """Return default headers of parser session.
+
+        None means the defaults of `client_session`.
+        """
+        return None
+
+    async def __aenter__(self):
+        # Connections for all pdf downloads, and one for page requests.
+        self._session = client_session(
+            limit_per_host=self.max_concurrent_pdfs + 1,
+            headers=self.session_headers(),
+        )
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self._session.close()
+        self._session = None
 
 
-class ParserCetatenie:
+class ParserCetatenie(SessionParser):
     """Class which provide web scrapping methods."""
 
     articolul_urls = {
@@ -140,15 +449,83 @@ class ParserCetatenie:
     }
 
     @aiohttp_session(sleeps=(4, 10), attempts=10, timeout=3)
+    async def _fetch_page(self, session: ClientSession, url: str) -> str:
+        """Return html of articolul page."""
+        # Taken once, the entry may be evicted while the page is fetched.
+        cached = _HTTP_CACHE.get(url)
+        headers = _conditional_headers(cached)
+        async with session.get(url, headers=headers) as resp:
+            if resp.status == 304 and cached is not None:
+                return cached[1]
+            page_text = await resp.text(encoding="utf-8", errors="replace")
+            validators = _validators(resp)
+
+        if validators:
+            _HTTP_CACHE.set(url, validators, page_text)
+        return page_text
+
+    @classmethod
+    def validate_articoluls_data(cls, articoluls_data: Any) -> dict[str, int]:
+        """Check request body of `parse_articoluls`.
+
+        Parameters
+        ----------
+        articoluls_data : Any
+            request body.
+
+        Returns
+        -------
+        dict[str, int]
+            articolul num by articolul of request body, e.g.
+            `{"articolul_10": 10}`.
+
+        Raises
+        ------
+        TypeError
+            if articoluls data is wrong
+        """
+        if not isinstance(articoluls_data, dict):
+            msg = f"request must be an object, now - {articoluls_data}"
+            raise TypeError(msg)
+
+        articolul_nums = {}
+        for articolul, years in articoluls_data.items():
+            match = _ARTICOLUL_KEY_RE.fullmatch(articolul)
+            if match is None:
+                msg = (
+                    "articolul must be named like "
+                    f"`articolul_10`, now - {articolul}"
+                )
+                raise TypeError(msg)
+
+            if match.group(1) not in cls.articolul_urls:
+                names = ", ".join(f"articolul_{n}" for n in cls.articolul_urls)
+                msg = f"unknown {articolul}, must be one of {names}"
+                raise TypeError(msg)
+
+            if not isinstance(years, dict) or not all(
+                isinstance(known, list)
+                and all(isinstance(num, str) for num in known)
+                for known in years.values()
+            ):
+                msg = (
+                    f"{articolul} must be an object of lists of known "
+                    f"numbers by years, now - {years}"
+                )
+                raise TypeError(msg)
+
+            # Article num. e.g. 10
+            articolul_nums[articolul] = int(match.group(1))
+
+        return articolul_nums
+
     async def _collect_scrapping_tasks(
-        self, session: ClientSession, articoluls_data: dict, path_data: str
+        self, articoluls_data: dict, path_data: str
     ) -> List[Coroutine]:
         """Collect correctly tasks for scrapping articoluls.
 
         Parameters
         ----------
-        session : ClientSession
-            generated aiohttp session.
         articoluls_data : dict
             request body.
         path_data : str
@@ -164,84 +541,90 @@ class ParserCetatenie:
         TypeError
             if articoluls data is wrong
         """
-        tasks = []
+        articolul_nums = self.validate_articoluls_data(articoluls_data)
 
-        for articolul in articoluls_data:
-            if not articolul.split("_")[-1].isdigit():
-                msg = (
-                    "articolul must be named like "
-                    f"`articolul_10`, now - {articolul}"
-                )
-                raise TypeError(msg)
-
-            # Article num. e.g. 10
-            articolul_num = int(articolul.split("_")[-1])
+        async def collect(articolul: str, articolul_num: int) -> list:
             # Url for needed article
             url = self.articolul_urls[str(articolul_num)]
 
-            # Set headers
-            headers = HEADERS
-            headers["User-Agent"] = session.headers["User-Agent"]
-            session._default_headers = headers
-
-            async with session.get(url) as resp:
-                page_text = await resp.text()
-
-            soup = BeautifulSoup(page_text, "html.parser")
-            articles_block = soup.find("div", class_="penci-entry-content")
-
-            # Iters for years articles
-            for year_block in articles_block.find_all("ul"):
-                if not isinstance(year_block, Tag):
-                    continue
+            page_text = await self._fetch_page(url)
+            articles = await asyncio.to_thread(
+                self._find_new_articles, page_text, articoluls_data[articolul]
+            )
+            return [
+                self._collect_data(
+                    url=link,
+                    dt=article_date,
+                    articolul_num=articolul_num,
+                    num=num,
+                    src_path=path_data,
+                )
+                for link, article_date, num in articles
+            ]
 
-                # Iters for articles in concrete year
-                for article in year_block.find_all("li"):
-                    if not isinstance(article, Tag):
-                        continue
+        # Articolul pages are fetched concurrently.
+        pages_tasks = await asyncio.gather(
+            *(collect(a, num) for a, num in articolul_nums.items())
+        )
+        return [task for tasks in pages_tasks for task in tasks]
 
-                    if article.find("a") is None:
-                        continue
+    def _find_new_articles(
+        self, page_text: str, known: dict[str, list[str]]
+    ) -> list[tuple[str, datetime.datetime, str]]:
+        """Find articles from articolul page which aren't in request.
 
-                    # Get raw datetime article
-                    _article_date = re.findall(r"\d+\.\d+\.\d+", article.text)
-                    if not _article_date:
-                        continue
+        Parameters
+        ----------
+        page_text : str
+            html of articolul page.
+        known : dict[str, list[str]]
+            known article numbers by years, from request body.
 
-                    article_date = datetime.datetime.strptime(
-                        _article_date[0],
-                        "%d.%m.%Y",
-                    ).replace(tzinfo=datetime.UTC)
+        Returns
+        -------
+        list[tuple[str, datetime.datetime, str]]
+            link to pdf, date and number of every new article.
+        """
+        articles = []
+        known = {year: frozenset(nums) for year, nums in known.items()}
+        # Collect articles over the last 6 years, i.e. while less than
+        # 7 * 365 days old.
+        cutoff = datetime.datetime.now(datetime.UTC) - datetime.timedelta(
+            days=7 * 365
+        )
+        tree = lxml_html.fromstring(page_text)
+
+        # Iters for articles of all years
+        for article in _ARTICLES_XPATH(tree):
+            a = _LINK_XPATH(article)[0]
+
+            # Get raw datetime article
+            _article_date = _DATE_RE.search(article.text_content())
+            if not _article_date:
+                continue
 
-                    # If this year not in request data, continue it
-                    if str(article_date.year) not in articoluls_data[articolul]:
-                        continue
+            # If this year not in request data, continue it
+            year = _article_date.group(3)
+            if year not in known or int(year) < cutoff.year:
+                continue
 
-                    # If num in request data. Means this article is old
-                    num = article.find("a").text
-                    if (
-                        num
-                        in articoluls_data[articolul][str(article_date.year)]
-                    ):
-                        continue
+            # If num in request data. Means this article is old
+            num = a.text_content()
+            if num in known[year]:
+                continue
 
-                    # Collect articles over the last 6 years
-                    if (
-                        datetime.datetime.now(datetime.UTC) - article_date
-                    ).days // 365 > 6:
-                        continue
+            article_date = datetime.datetime(
+                int(year),
+                int(_article_date.group(2)),
+                int(_article_date.group(1)),
+                tzinfo=datetime.UTC,
+            )
+            if article_date <= cutoff:
+                continue
 
-                    link = article.find("a")["href"]
-                    task = self._collect_data(
-                        url=link,
-                        dt=article_date,
-                        articolul_num=articolul_num,
-                        num=num,
-                        src_path=path_data,
-                    )
-                    tasks.append(task)
+            articles.append((a.get("href"), article_date, num))
 
-        return tasks
+        return articles
 
     async def parse_articoluls(
         self, articoluls_data: dict, path_data: str
@@ -274,58 +657,79 @@ class ParserCetatenie:
             if articoluls_data keys don't validated.
         """
         # Create path for PDF's
-        Path(path_data).mkdir(parents=True, exist_ok=True)
+        await asyncio.to_thread(
+            Path(path_data).mkdir, parents=True, exist_ok=True
+        )
 
         tasks = await self._collect_scrapping_tasks(articoluls_data, path_data)
-        articoluls = {}
 
         pdf = ParserPDF()
+        loop = asyncio.get_running_loop()
 
         async def collect_numbers(
-            path: str,
-            dt: datetime.datetime,
-            articolul_num: int,
-            num: int,
-            url_pdf: str,
-        ):
-            numbers = await asyncio.to_thread(pdf.extract_numbers, path)
-            for number_order in numbers:
-                articoluls[f"articolul_{articolul_num}"].append(
-                    {
-                        "list_name": num,
-                        "number_order": number_order,
-                        "year": dt.year,
-                        "date": dt.strftime("%d.%m.%Y"),
-                        "pdf_link": url_pdf,
-                        "timestamp": time.time(),
-                    }
-                )
-
-        collect_number_tasks = []
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-
-        for res in results:
-            if not isinstance(res, tuple):
-                continue
-
-            path, dt, articolul_num, num, url_pdf = res
-
-            if not articoluls.get(f"articolul_{articolul_num}"):
-                articoluls[f"articolul_{articolul_num}"] = []
-
-            collect_number_tasks.append(
-                collect_numbers(
-                    path=path,
-                    dt=dt,
-                    articolul_num=articolul_num,
-                    num=num,
-                    url_pdf=url_pdf,
-                )
+            task: Coroutine,
+        ) -> tuple[str, list[dict]] | None:
+            try:
+                path, dt, articolul_num, num, url_pdf, validators = await task
+            except Exception:
+                # Skip pdfs which couldn't be downloaded, `_collect_data`
+                # has logged them.
+                return None
+
+            if isinstance(path, list):
+                # Not modified since it was parsed.
+                numbers = path
+            else:
+                try:
+                    numbers = await loop.run_in_executor(
+                        get_pdf_pool(), pdf.extract_numbers, path
+                    )
+                except Exception as exc:
+                    # Skip pdfs which couldn't be parsed too, one bad pdf
+                    # must not cancel the others in the task group.
+                    logger.opt(exception=exc).error(
+                        f"failed to extract numbers from {url_pdf}"
+                    )
+                    return None
+                finally:
+                    # Free disk space before the other pdfs are downloaded.
+                    await asyncio.to_thread(os.unlink, path)
+                if validators:
+                    _HTTP_CACHE.set(url_pdf, validators, numbers)
+
+            date = dt.strftime("%d.%m.%Y")
+            timestamp = time.time()
+            return f"articolul_{articolul_num}", [
+                {
+                    "list_name": num,
+                    "number_order": number_order,
+                    "year": dt.year,
+                    "date": date,
+                    "pdf_link": url_pdf,
+                    "timestamp": timestamp,
+                }
+                for number_order in numbers
+            ]
+
+        # Every pdf is parsed as soon as it's downloaded.
+        try:
+            async with asyncio.TaskGroup() as tg:
+                collect_tasks = [
+                    tg.create_task(collect_numbers(task)) for task in tasks
+                ]
+        finally:
+            await asyncio.to_thread(
+                shutil.rmtree, path_data, ignore_errors=True
             )
 
-        await asyncio.gather(*collect_number_tasks)
-
-        shutil.rmtree(path_data)
+        # Merged in order of articles on pages, not of parsing.
+        articoluls = {}
+        for collect_task in collect_tasks:
+            result = collect_task.result()
+            if result is None:
+                continue
+            key, orders = result
+            articoluls.setdefault(key, []).extend(orders)
         return articoluls
 
     async def _collect_data(
@@ -335,24 +739,36 @@ class ParserCetatenie:
         articolul_num: int,
         num: int,
         src_path: str,
-    ) -> tuple[str, datetime.datetime, int]:
-        @aiohttp_session(sleeps=(5, 10), attempts=10)
-        async def parse(self, session: ClientSession):
-            # Set headers
-            headers = PDF_HEADERS
-            headers["User-Agent"] = session.headers["User-Agent"]
-            session._default_headers = headers
+    ) -> tuple[str | list[str], datetime.datetime, int, int, str, dict]:
+        """Download pdf of article.
 
-            async with session.get(url) as resp:
+        Returns path to pdf, or its numbers from `_HTTP_CACHE` if the pdf
+        wasn't modified, with article data and validators of response.
+        """
+
+        @aiohttp_session(sleeps=(5, 10), attempts=10, semaphore=self._pdf_sem)
+        async def parse(self, session: ClientSession):
+            # Taken once, the entry may be evicted while pdf is fetched.
+            cached = _HTTP_CACHE.get(url)
+            headers = PDF_HEADERS | {
+                "User-Agent": session.headers["User-Agent"],
+                **_conditional_headers(cached),
+            }
+            async with session.get(url, headers=headers) as resp:
                 resp.raise_for_status()
-                fn = str(Path(src_path) / f"{url.split("/")[-1]}")
+                if resp.status == 304 and cached is not None:
+                    return cached[1], dt, articolul_num, num, url, {}
 
-                async with aiofiles.open(fn, "wb") as f:
-                    await f.write(await resp.read())
+                fn = str(Path(src_path) / f"{url.split("/")[-1]}")
+                await _save_response(resp, fn)
 
-            return fn, dt, articolul_num, num, url
+            return fn, dt, articolul_num, num, url, _validators(resp)
 
-        return await parse(self)
+        try:
+            return await parse(self)
+        except Exception as exc:
+            logger.opt(exception=exc).error(f"failed to download {url}")
+            raise
 
 
 def is_date(string, fuzzy=False):
@@ -378,56 +794,59 @@ class ParserPDF:
         if not Path(path_to_pdf).exists():
             raise FileNotFoundError(path_to_pdf)
 
-        text = extract_text(path_to_pdf)
-        lines = text.split("\n")
-        return [
-            i.group(2)
-            for i in filter(
-                None, [re.match(r"(\d+\.) (.+)", string=line) for line in lines]
+        # Matches never cross pages, so pages are scanned one by one.
+        with fitz.open(path_to_pdf) as doc:
+            numbers = [
+                number
+                for page in doc
+                for number in _NUMBER_ORDER_RE.findall(page.get_text("text"))
+            ]
+
+        if not numbers:
+            # Fall back to pdfminer when MuPDF lays the text out differently.
+            numbers = _NUMBER_ORDER_RE.findall(extract_text(path_to_pdf))
+        return numbers
+
+    @staticmethod
+    def _merge_columns(columns: list[str]) -> list[str]:
+        """Join column names which pdf splits into several spans."""
+        merged = []
+        i = 0
+        while i < len(columns):
+            c = columns[i]
+            if c.endswith(" ") and i + 1 < len(columns):
+                merged.append(f"{c.strip()} {columns[i + 1].strip()}")
+                i += 2
+            else:
+                merged.append(c)
+                i += 1
+        return merged
+
+    def _extract_columns_and_content(self, path_to_pdf: str):
+        """Return column names from first page and text blocks of pdf.
+
+        Both come from one pass over the pages, split into contiguous
+        ranges in `get_pdf_pool`.
+        """
+        with fitz.open(path_to_pdf) as pages:
+            page_count = pages.page_count
+
+        parts = min(PDF_POOL_WORKERS, page_count) or 1
+        bounds = [page_count * i // parts for i in range(parts + 1)]
+        results = list(
+            get_pdf_pool().map(
+                _extract_pages_content,
+                repeat(str(path_to_pdf)),
+                bounds[:-1],
+                bounds[1:],
             )
+        )
+        columns = self._merge_columns(results[0][0])
+        contents = [
+            line_raw
+            for _, range_contents in results
+            for line_raw in range_contents
         ]
-
-    def _find_columns_for_dosar(self, path_to_pdf: str):
-        pages = fitz.open(path_to_pdf)
-        page = pages[0]
-        obj = page.get_textpage().extractDICT()
-        columns = [
-            span["text"]
-            for block in obj["blocks"]
-            for line in block["lines"]
-            for span in line["spans"]
-            if span["font"].lower().count("bold")
-        ]
-        for c in columns:
-            i = columns.index(c)
-            if c.endswith(" "):
-                columns[i] = f"{c.strip()} {columns.pop(i+1).strip()}"
-        return columns
-
-    def _find_content_for_dosar(self, path_to_pdf: str):
-        pages = fitz.open(path_to_pdf)
-        contents = []
-        columns = self._find_columns_for_dosar(path_to_pdf)
-        for page in pages:
-            obj = page.get_textpage().extractDICT()
-            line_content = []
-            for block in obj["blocks"]:
-                for line in block["lines"]:
-                    if any(
-                        s["font"].lower().count("bold") for s in line["spans"]
-                    ):
-                        continue
-
-                    for span in line["spans"]:
-                        v = span["text"].strip()
-                        line_content.append(v)
-
-                line_raw = "$".join(line_content.copy())
-                if not line_raw:
-                    continue
-                contents.append(line_raw)
-                line_content.clear()
-
         return columns, contents
 
     def extract_dosar_data(
@@ -437,110 +856,112 @@ class ParserPDF:
         if not Path(path_to_pdf).exists():
             raise FileNotFoundError(path_to_pdf)
 
-        columns, lines = self._find_content_for_dosar(path_to_pdf)
+        columns, lines = self._extract_columns_and_content(path_to_pdf)
         return [
             Dosar(articolul_num=articolul_num, year=year, raw_dosar=raw_dosar)
             for raw_dosar in lines
         ]
 
 
-class ParserDosars:
+class ParserDosars(SessionParser):
     urls = {
         "10": "https://cetatenie.just.ro/stadiu-dosar/#1576832764783-e9f4e574-df23",
         "11": "https://cetatenie.just.ro/stadiu-dosar/#1576832773102-627a212f-45ce",
     }
 
-    @property
+    base_headers = MappingProxyType({
+        "Accept": "*/*",
+        "Accept-Language": "*",
+        "Connection": "keep-alive",
+        "Referer": "https://cetatenie.just.ro/stadiu-dosar/",
+        "Sec-Fetch-Dest": "document",
+        "Sec-Fetch-Mode": "navigate",
+        "Sec-Fetch-Site": "same-origin",
+        "Sec-Fetch-User": "?1",
+        "Upgrade-Insecure-Requests": "1",
+    })
+
+    @functools.cached_property
     def headers(self):
-        headrs = {
-            "Accept": "*/*",
-            "Accept-Language": "*",
-            "Connection": "keep-alive",
-            "Referer": "https://cetatenie.just.ro/stadiu-dosar/",
-            "Sec-Fetch-Dest": "document",
-            "Sec-Fetch-Mode": "navigate",
-            "Sec-Fetch-Site": "same-origin",
-            "Sec-Fetch-User": "?1",
-            "Upgrade-Insecure-Requests": "1",
-        }
-        ua = ua_generator.generate(platform=("android", "ios"))
-        for k, v in ua.headers.get().items():
-            headrs[k] = v
-
-        return headrs
+        """Headers with a mobile user agent, same for all parser requests."""
+        return self.base_headers | random.choice(_mobile_ua_headers())
+
+    def session_headers(self) -> Mapping[str, str]:
+        """Return `headers`, which replace desktop session headers."""
+        return self.headers
 
     async def _download_pdf(self, url: str, year: int, src_path: str):
-        @aiohttp_session(sleeps=(4, 8), timeout=15)
+        @aiohttp_session(sleeps=(4, 8), timeout=15, semaphore=self._pdf_sem)
         async def parse(self, session: aiohttp.ClientSession):
-            session._default_headers = self.headers
-            async with session.get(url) as resp:
-                content = await resp.read()
-
-            await asyncio.to_thread(resp.raise_for_status)
-
             fn = str(Path(src_path) / f"{url.split("/")[-1]}")
-
-            async with aiofiles.open(fn, "wb") as f:
-                await f.write(content)
+            async with session.get(url) as resp:
+                resp.raise_for_status()
+                await _save_response(resp, fn)
 
             return fn, year
 
         return await parse(self)
 
+    def _find_records(self, html: str, id_panel: str) -> list[tuple[str, str]]:
+        """Return years and links of dosars pdfs from panel of page."""
+        tree = lxml_html.fromstring(html)
+        records = []
+        for r in _RECORDS_XPATH(tree, panel=id_panel):
+            links = _LINK_XPATH(r)
+            if not links:
+                continue
+            records.append((links[0].text_content(), links[0].get("href")))
+        return records
+
     async def _parse_dosars(self, articolul_nums: list[int]):
         @aiohttp_session()
-        async def parse(_, session: aiohttp.ClientSession, articolul_num: int):
-            session._default_headers = self.headers
-            async with session:
-                url = self.urls[str(articolul_num)]
-                async with session.get(url) as resp:
-                    html = await resp.text()
-                soup = BeautifulSoup(html, "lxml")
-                id_panel = url.split("#")[-1]
-                records_raw = (
-                    soup.find("div", class_="vc_tta-panels")
-                    .find("div", id=id_panel)
-                    .find("ul")
-                    .find_all("li")
-                )
-                tasks = []
-                records = []
-                for r in records_raw:
-                    a = r.find("a")
-                    if not a:
+        async def fetch_records(
+            _, session: aiohttp.ClientSession, url: str
+        ) -> list[tuple[str, str]]:
+            async with session.get(url) as resp:
+                html = await resp.text(encoding="utf-8", errors="replace")
+            return await asyncio.to_thread(
+                self._find_records, html, url.split("#")[-1]
+            )
+
+        async def parse(_, articolul_num: int):
+            records = await fetch_records(self, self.urls[str(articolul_num)])
+
+            tasks = []
+            prefix = f"{time.time()}-{articolul_num}-"
+            with tempfile.TemporaryDirectory(prefix=prefix) as tempdir:
+                dt_now = datetime.datetime.now()
+                for year, url in records:
+                    if dt_now.year - int(year) > 6:
                         continue
-                    records.append((a.string, a["href"]))
-
-                prefix = f"{time.time()}-{articolul_num}-"
-                with tempfile.TemporaryDirectory(prefix=prefix) as tempdir:
-                    dt_now = datetime.datetime.now()
-                    for year, url in records:
-                        if dt_now.year - int(year) > 6:
-                            continue
-
-                        tasks.append(
-                            self._download_pdf(
-                                url=url,
-                                year=year,
-                                src_path=tempdir,
+
+                    tasks.append(
+                        self._download_pdf(
+                            url=url,
+                            year=year,
+                            src_path=tempdir,
+                        )
+                    )
+                paths = await asyncio.gather(*tasks, return_exceptions=True)
+                # Failed downloads are skipped.
+                jobs = [
+                    (path[0], articolul_num, path[1])
+                    for path in paths
+                    if isinstance(path, tuple)
+                ]
+                p = ParserPDF()
+
+                def _pool():
+                    # Pages are parsed in `get_pdf_pool`, threads only
+                    # wait for them, so several pdfs share the workers.
+                    with ThreadPoolExecutor(PDF_POOL_WORKERS) as exec:
+                        return list(
+                            exec.map(
+                                lambda job: p.extract_dosar_data(*job), jobs
                             )
                         )
-                    paths = await asyncio.gather(*tasks, return_exceptions=True)
-                    p = ParserPDF()
-
-                    def _pool():
-                        res = []
-                        with ThreadPoolExecutor() as exec:
-                            for r in exec.map(
-                                p.extract_dosar_data,
-                                [p[0] for p in paths],
-                                [articolul_num for _ in paths],
-                                [p[1] for p in paths],
-                            ):
-                                res.append(r)
-                            return res
-
-                    return await asyncio.to_thread(_pool)
+
+                return await asyncio.to_thread(_pool)
 
         async_tasks = [parse(self, num) for num in articolul_nums]
         res = await asyncio.gather(*async_tasks)
@@ -563,8 +984,8 @@ class ParserDosars:
 
 async def main() -> None:  # noqa: D103
     p = ParserPDF()
-    s = ParserDosars()
-    result = await s.parse_dosars()
+    async with ParserDosars() as s:
+        result = await s.parse_dosars()
     ...
 
 
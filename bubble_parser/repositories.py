@@ -16,6 +16,7 @@ from sqlalchemy import (
     text,
     update,
 )
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.exc import IntegrityError
 
 from bubble_parser.app_types import (
@@ -66,6 +67,7 @@ class SQLAlchemyRepository(AbstractRepository):
     async def _execute_stmt(
         self,
         stmt: Select | Insert | Update | Delete | str,
+        params: list[dict] | dict | None = None,
         stream: bool = False,
     ) -> CursorResult | AsyncResult:
         if isinstance(stmt, str):
@@ -74,8 +76,8 @@ class SQLAlchemyRepository(AbstractRepository):
         conn = await self._session.connection()
 
         if stream:
-            return await conn.stream(stmt)
-        return await conn.execute(stmt)
+            return await conn.stream(stmt, params)
+        return await conn.execute(stmt, params)
 
     async def get(
         self, stmt: Select, stream: bool = False
@@ -91,23 +93,47 @@ class SQLAlchemyRepository(AbstractRepository):
         """Delete entity from sqlalchemy repository."""
         return await self._execute_stmt(stmt)
 
-    async def create(self, stmt: Insert) -> CursorResult:
-        """Create entity in sqlalchemy repository."""
-        return await self._execute_stmt(stmt)
+    async def create(
+        self, stmt: Insert, params: list[dict] | None = None
+    ) -> CursorResult:
+        """Create entity in sqlalchemy repository.
+
+        If `params` is a list of rows, the statement is executed once
+        for all of them (executemany).
+        """
+        return await self._execute_stmt(stmt, params)
 
 
 class ArticolulRepository(SQLAlchemyRepository):
     _model = ArticolulTable
 
     async def create(self, articolul: Articolul) -> int:
-        """Create articolul in repository, return articolul repository-id."""
+        """Create articolul in repository, return articolul repository-id.
+
+        Articolul with the same number is not created twice.
+        """
         stmt = (
-            insert(self._model)
+            pg_insert(self._model)
             .values(**dump_without_null(articolul))
+            .on_conflict_do_nothing(index_elements=[self._model.number])
             .returning(self._model.articolul_id)
         )
         return await super().create(stmt)
 
+    async def bulk_create(self, articoluls: list[Articolul]) -> None:
+        """Create articoluls in repository with a single statement.
+
+        Articoluls whose numbers already exist are skipped.
+        """
+        if not articoluls:
+            return
+
+        stmt = pg_insert(self._model).on_conflict_do_nothing(
+            index_elements=[self._model.number]
+        )
+        rows = [dump_without_null(articolul) for articolul in articoluls]
+        await super().create(stmt, rows)
+
     async def delete(self, articolul_id: int) -> None:
         """Delete articolul from repository."""
         stmt = delete(self._model).where(
@@ -149,17 +175,33 @@ class ArticolulPDFRepository(SQLAlchemyRepository):
     async def create(self, pdf: ArticolulPDF) -> Optional[int]:
         r"""
         Create pdf in repository, return articolul pdf
-        repository-id.
+        repository-id. Pdf which already exists is skipped.
         """
         stmt = (
-            insert(self._model)
+            pg_insert(self._model)
             .values(**dump_without_null(pdf))
+            .on_conflict_do_nothing()
             .returning(self._model.pdf_id)
         )
-        try:
-            return await super().create(stmt)
-        except IntegrityError as e:
-            return None
+        return await super().create(stmt)
+
+    async def bulk_create(self, pdfs: list[ArticolulPDF]) -> list[int]:
+        """Create pdfs in repository with a single statement.
+
+        Pdfs which already exist are skipped, return repository-ids of
+        created pdfs.
+        """
+        if not pdfs:
+            return []
+
+        stmt = (
+            pg_insert(self._model)
+            .on_conflict_do_nothing()
+            .returning(self._model.pdf_id)
+        )
+        rows = [pdf.model_dump(exclude={"pdf_id"}) for pdf in pdfs]
+        res = await super().create(stmt, rows)
+        return list(res.scalars())
 
     async def delete(self, pdf_id: int) -> None:
         """Delete pdf from repository."""
@@ -200,6 +242,18 @@ class DosarRepository(SQLAlchemyRepository):
         except IntegrityError as e:
             return None
 
+    async def bulk_create(self, dosars: list[Dosar]) -> None:
+        """Create dosars in repository with a single statement.
+
+        Dosars which already exist in repository are skipped.
+        """
+        if not dosars:
+            return
+
+        stmt = pg_insert(self._model).on_conflict_do_nothing()
+        rows = [dosar.model_dump(exclude={"record_id"}) for dosar in dosars]
+        await super().create(stmt, rows)
+
     async def delete(self, record_id: int) -> None:
         """Delete dosar from repository."""
         stmt = delete(self._model).where(self._model.record_id == record_id)
@@ -0,0 +1,179 @@
+import asyncio
+
+import aiohttp
+import pytest
+
+from bubble_parser import api
+from bubble_parser.api import make_result, merge_requests, process_batch
+from bubble_parser.parser import ParserCetatenie
+
+
+def pdf(list_name: str, year: int, number_order: str = "(1/2022)") -> dict:
+    return {
+        "list_name": list_name,
+        "number_order": number_order,
+        "year": year,
+        "date": f"01.01.{year}",
+    }
+
+
+def test_merge_requests() -> None:
+    """Test for merge_requests of several request bodies."""
+    merged = merge_requests(
+        [
+            {"articolul_10": {"2023": ["1P", "2P"], "2024": ["5P"]}},
+            {
+                "articolul_10": {"2023": ["2P", "3P"]},
+                "articolul_11": {"2024": ["7P"]},
+            },
+        ]
+    )
+
+    assert merged.keys() == {"articolul_10", "articolul_11"}
+    assert merged["articolul_10"].keys() == {"2023", "2024"}
+    # Only lists known by every request asking for the year are skipped.
+    assert sorted(merged["articolul_10"]["2023"]) == ["2P"]
+    assert merged["articolul_10"]["2024"] == ["5P"]
+    assert merged["articolul_11"]["2024"] == ["7P"]
+
+
+def test_validate_articoluls_data() -> None:
+    """Test for validate_articoluls_data of valid request body."""
+    nums = ParserCetatenie.validate_articoluls_data(
+        {"articolul_10": {"2024": ["1P"]}, "articolul_11": {}}
+    )
+
+    assert nums == {"articolul_10": 10, "articolul_11": 11}
+
+
+@pytest.mark.parametrize(
+    "request_body",
+    [
+        ["articolul_10"],
+        {"articol_10": {"2024": []}},
+        {"articolul_12": {"2024": []}},
+        {"articolul_10": ["2024"]},
+        {"articolul_10": {"2024": "1P"}},
+        {"articolul_10": {"2024": [1]}},
+    ],
+)
+def test_validate_articoluls_data_malformed(request_body) -> None:
+    """Test for validate_articoluls_data with malformed request body."""
+    with pytest.raises(TypeError):
+        ParserCetatenie.validate_articoluls_data(request_body)
+
+
+def test_make_result() -> None:
+    """Test for make_result filtering merged result by request."""
+    res = {
+        "articolul_10": [pdf("1P", 2023), pdf("2P", 2023), pdf("5P", 2024)],
+        "articolul_11": [pdf("7P", 2024)],
+    }
+    request = {"articolul_10": {"2023": ["1P"]}}
+
+    result = make_result(res, request)
+
+    assert result["ok"] is True
+    assert result["result"] == {"articolul_10": [pdf("2P", 2023)]}
+
+
+def test_make_result_wrong_result() -> None:
+    """Test for make_result when parser returned not a dict."""
+    result = make_result(None, {"articolul_10": {"2024": []}})
+
+    assert result["ok"] is False
+    assert result["result"] == {}
+
+
+def make_batch(*requests: dict) -> list[tuple[dict, asyncio.Future]]:
+    loop = asyncio.get_running_loop()
+    return [(request, loop.create_future()) for request in requests]
+
+
+@pytest.mark.asyncio()
+async def test_process_batch(monkeypatch) -> None:
+    """Test for process_batch answering every request from one run."""
+    calls = []
+
+    async def parse_updates(request: dict) -> dict:
+        calls.append(request)
+        return {"articolul_10": [pdf("1P", 2024), pdf("2P", 2024)]}
+
+    monkeypatch.setattr(api, "parse_updates", parse_updates)
+    batch = make_batch(
+        {"articolul_10": {"2024": ["1P"]}},
+        {"articolul_10": {"2024": ["2P"]}},
+    )
+
+    await process_batch(batch)
+
+    assert len(calls) == 1
+    first, second = [future.result()["result"] for _, future in batch]
+    assert first == {"articolul_10": [pdf("2P", 2024)]}
+    assert second == {"articolul_10": [pdf("1P", 2024)]}
+
+
+@pytest.mark.asyncio()
+async def test_process_batch_network_error(monkeypatch) -> None:
+    """Test for process_batch when merged run failed with network error."""
+    calls = []
+
+    async def parse_updates(request: dict) -> dict:
+        calls.append(request)
+        raise aiohttp.ClientConnectionError("connection reset")
+
+    monkeypatch.setattr(api, "parse_updates", parse_updates)
+    batch = make_batch(
+        {"articolul_10": {"2024": []}}, {"articolul_11": {"2024": []}}
+    )
+
+    await process_batch(batch)
+
+    # Requests are not parsed again one by one.
+    assert len(calls) == 1
+    for _, future in batch:
+        assert future.result()["ok"] is False
+        assert "connection reset" in future.result()["message"]
+
+
+@pytest.mark.asyncio()
+@pytest.mark.parametrize(
+    "bad_request", [{"articolul_10": []}, {"articolul_12": {"2024": []}}]
+)
+async def test_process_batch_malformed_request(
+    monkeypatch, bad_request
+) -> None:
+    """Test for process_batch when one request of batch is malformed."""
+    calls = []
+
+    async def parse_updates(request: dict) -> dict:
+        calls.append(request)
+        return {"articolul_10": [pdf("1P", 2024)]}
+
+    monkeypatch.setattr(api, "parse_updates", parse_updates)
+    batch = make_batch({"articolul_10": {"2024": []}}, bad_request)
+
+    await process_batch(batch)
+    good, bad = [future.result() for _, future in batch]
+
+    # Only the valid request is parsed, with one run.
+    assert calls == [{"articolul_10": {"2024": []}}]
+    assert good["result"] == {"articolul_10": [pdf("1P", 2024)]}
+    assert bad["ok"] is False
+    assert bad["message"].startswith("TypeError")
+
+
+@pytest.mark.asyncio()
+async def test_process_batch_make_result_error(monkeypatch) -> None:
+    """Test for process_batch when result of request couldn't be made."""
+
+    async def parse_updates(request: dict) -> dict:
+        return {"articolul_10": [{"list_name": "1P"}]}
+
+    monkeypatch.setattr(api, "parse_updates", parse_updates)
+    batch = make_batch({"articolul_10": {"2024": []}})
+
+    await process_batch(batch)
+
+    with pytest.raises(KeyError):
+        batch[0][1].result()
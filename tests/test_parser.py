@@ -0,0 +1,59 @@
+import datetime
+
+from bubble_parser.parser import ParserCetatenie
+
+
+def article(num: str, date: datetime.date, link: bool = True) -> str:
+    if link:
+        num = f'<a href="https://example.com/{num}.pdf">{num}</a>'
+    return f"<li>{num} din {date:%d.%m.%Y}</li>"
+
+
+def midnight(date: datetime.date) -> datetime.datetime:
+    return datetime.datetime(
+        date.year, date.month, date.day, tzinfo=datetime.UTC
+    )
+
+
+def test_find_new_articles() -> None:
+    """Test for _find_new_articles filtering articles of articolul page."""
+    now = datetime.datetime.now(datetime.UTC)
+    cutoff = now - datetime.timedelta(days=7 * 365)
+    recent = (now - datetime.timedelta(days=10)).date()
+    oldest = (cutoff + datetime.timedelta(days=1)).date()
+    too_old = (cutoff - datetime.timedelta(days=40)).date()
+    articles = [
+        article("1P", recent),
+        # Known already.
+        article("2P", recent),
+        # Year isn't requested.
+        article("3P", datetime.date(recent.year - 1, 6, 1)),
+        # 7 * 365 days old and older.
+        article("4P", cutoff.date()),
+        article("5P", too_old),
+        # Without link to pdf.
+        article("6P", recent, link=False),
+        f"<li><a>7P</a> din {recent:%d.%m.%Y}</li>",
+        article("8P", oldest),
+    ]
+    html = (
+        '<html><body><div class="entry penci-entry-content"><ul>'
+        f"{"".join(articles)}"
+        # Only the first entry content is parsed.
+        '</ul></div><div class="penci-entry-content"><ul>'
+        f'{article("9P", recent)}'
+        "</ul></div></body></html>"
+    )
+    known = {
+        str(recent.year): ["2P"],
+        str(cutoff.year): [],
+        str(too_old.year): [],
+    }
+
+    new_articles = ParserCetatenie()._find_new_articles(html, known)
+
+    assert new_articles == [
+        ("https://example.com/1P.pdf", midnight(recent), "1P"),
+        ("https://example.com/8P.pdf", midnight(oldest), "8P"),
+    ]
+    assert all(dt.tzinfo is datetime.UTC for _, dt, _ in new_articles)
@@ -2,9 +2,27 @@ import json
 from datetime import datetime
 
 import pytest
-from bubble_parser.app_types import Dosar
-from bubble_parser.database import create_sqlalchemy_async_engine, write_dosars, write_result
+import pytest_asyncio
+from sqlalchemy import text
+
+from bubble_parser.app_types import Articolul, Dosar
+from bubble_parser.database import (
+    create_sqlalchemy_async_engine,
+    dispose_engine,
+    get_sessionmaker,
+    setup_db,
+    write_dosars,
+    write_result,
+)
 from bubble_parser.models import Base
+from bubble_parser.repositories import ArticolulRepository
+
+
+@pytest_asyncio.fixture(autouse=True)
+async def _dispose_engine():
+    """Close pooled connections before the test's event loop closes."""
+    yield
+    await dispose_engine()
 
 
 @pytest.mark.asyncio()
@@ -42,3 +60,34 @@ async def test_write_dosars():
 
     
     await write_dosars(dosars)
+
+
+@pytest.mark.asyncio()
+async def test_upsert_articoluls_on_dump_schema() -> None:
+    """Test articoluls upsert on schema of the shipped database dump."""
+    engine = create_sqlalchemy_async_engine()
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+        # The dump is at revision 4d960622fd50, without unique numbers.
+        await conn.execute(
+            text("ALTER TABLE articoluls DROP CONSTRAINT articoluls_number_key")
+        )
+        await conn.execute(
+            text("INSERT INTO articoluls (number) VALUES (10), (10)")
+        )
+    await engine.dispose()
+
+    await setup_db()
+
+    session = get_sessionmaker()
+    async with session() as db:
+        repository = ArticolulRepository(db)
+        await repository.bulk_create(
+            [Articolul(number=10), Articolul(number=11)]
+        )
+        await repository.create(Articolul(number=11))
+        res = await db.execute(
+            text("SELECT number FROM articoluls ORDER BY number")
+        )
+        assert res.scalars().all() == [10, 11]
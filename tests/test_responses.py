@@ -0,0 +1,40 @@
+from datetime import datetime
+
+import orjson
+import pytest
+
+from bubble_parser.api import iter_dosars_json
+from bubble_parser.app_types import Dosar
+
+
+def dosar(i: int) -> Dosar:
+    return Dosar(
+        num_dosar=str(i),
+        date=datetime(2024, 5, 5),
+        raw_dosar=f"{i}/RD/2024",
+        articolul_num=10,
+        year=2024,
+    )
+
+
+@pytest.mark.asyncio()
+@pytest.mark.parametrize("count", [0, 1, 3, 7])
+async def test_iter_dosars_json(count: int) -> None:
+    """Test for iter_dosars_json making valid JSON of head and dosars."""
+    dosars = [dosar(i) for i in range(count)]
+    head = {"ok": True, "message": f"{count} dosars written to db"}
+
+    body = b"".join(
+        [chunk async for chunk in iter_dosars_json(head, dosars, chunk_size=3)]
+    )
+    data = orjson.loads(body)
+
+    assert data.keys() == {"ok", "message", "dosars"}
+    assert data["ok"] is True
+    assert data["message"] == head["message"]
+    assert data["dosars"] == [
+        orjson.loads(d.model_dump_json()) for d in dosars
+    ]
+    assert [d["raw_dosar"] for d in data["dosars"]] == [
+        f"{i}/RD/2024" for i in range(count)
+    ]